@@ -1,11 +1,11 @@
 import streamlit as st
-import os
 import random
+import hashlib
 from dotenv import load_dotenv
-from google import genai
 
 # ================= IMPORTS =================
 from utils.gemini_analysis import (
+    get_client,
     get_severity_color,
     get_score_color,
     get_category_icon,
@@ -23,8 +23,14 @@ from data.url_examples import (
 )
 
 # ================= CONFIG =================
-load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+@st.cache_resource
+def init_client():
+    """Load .env and build the Gemini client once per process."""
+    load_dotenv()
+    return get_client()
+
+
+client = init_client()
 
 st.set_page_config(
     page_title="Digital Literacy Assistant",
@@ -32,18 +38,123 @@ st.set_page_config(
     layout="wide"
 )
 
+# ================= CACHING =================
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_analyze_message(text_hash, _text):
+    """
+    Cache analyses by text hash so identical pastes and unrelated
+    widget reruns don't hit Gemini again. The leading underscore keeps
+    Streamlit from hashing the raw text itself.
+    """
+    return analyze_message(_text)
+
+
 # ================= SESSION STATE =================
 defaults = {
     "quiz_mode": False,
     "current_quiz": None,
     "quiz_revealed": False,
     "quiz_score": 0,
-    "quizzes_taken": 0
+    "quizzes_taken": 0,
+    "compare_idx": random.randrange(len(COMPARISON_EXAMPLES)),
+    "url_quiz_idx": random.randrange(len(URL_QUIZ_EXAMPLES)),
+    "last_analysis_hash": None,
+    "last_analysis_result": None
 }
 
 for k, v in defaults.items():
     st.session_state.setdefault(k, v)
 
+# ================= LEARN MORE FRAGMENTS =================
+# Each tab is a fragment so its buttons only rerun that tab, not the
+# whole script. State changes go through on_click callbacks, which run
+# before the fragment reruns, so no explicit st.rerun() is needed.
+def start_quiz():
+    st.session_state.quiz_mode = True
+    st.session_state.current_quiz = random.choice(QUIZ_EXAMPLES)
+    st.session_state.quiz_revealed = False
+
+
+def reveal_answer():
+    st.session_state.quiz_revealed = True
+    st.session_state.quizzes_taken += 1
+    st.session_state.quiz_score += st.session_state.current_quiz.get("risk_score", 0)
+
+
+def next_question():
+    st.session_state.current_quiz = random.choice(QUIZ_EXAMPLES)
+    st.session_state.quiz_revealed = False
+
+
+@st.fragment
+def quiz_tab():
+    if not st.session_state.quiz_mode:
+        st.button("▶ Start Quiz", on_click=start_quiz)
+    else:
+        quiz = st.session_state.current_quiz
+        st.markdown(f"**Message:**\n\n{quiz['text']}")
+
+        st.button("Reveal Answer", on_click=reveal_answer)
+
+        if st.session_state.quiz_revealed:
+            st.info(
+                quiz.get("explanation") or
+                quiz.get("reason") or
+                "This message contains common scam indicators."
+            )
+
+            st.button("➡ Next Question", on_click=next_question)
+
+
+def shuffle_compare():
+    st.session_state.compare_idx = (
+        (st.session_state.compare_idx + 1) % len(COMPARISON_EXAMPLES)
+    )
+
+
+def shuffle_url_quiz():
+    st.session_state.url_quiz_idx = (
+        (st.session_state.url_quiz_idx + 1) % len(URL_QUIZ_EXAMPLES)
+    )
+
+
+@st.fragment
+def compare_tab():
+    # Example stays fixed across reruns until the user asks for another
+    example = COMPARISON_EXAMPLES[st.session_state.compare_idx]
+    c1, c2 = st.columns(2)
+    with c1:
+        st.error(example["suspicious"])
+    with c2:
+        st.success(example["legitimate"])
+
+    st.button("🔀 Shuffle", key="shuffle_compare", on_click=shuffle_compare)
+
+
+@st.fragment
+def url_safety_tab():
+    st.subheader("🔗 URL Safety Education")
+    for tip in URL_SAFETY_TIPS["basic_checks"]:
+        st.markdown(f"- {tip}")
+
+    quiz = URL_QUIZ_EXAMPLES[st.session_state.url_quiz_idx]
+    st.success(f"Legitimate: {quiz['legitimate']}")
+    st.error(f"Phishing: {quiz['phishing']}")
+    st.button("🔀 Shuffle", key="shuffle_url_quiz", on_click=shuffle_url_quiz)
+
+    with st.expander("Why is this dangerous?"):
+        st.write(
+            quiz.get(
+                "explanation",
+                "This URL uses deceptive patterns common in phishing attacks."
+            )
+        )
+
+    for case in PHISHING_CASE_STUDIES:
+        with st.expander(case["title"]):
+            st.warning(case["phishing_url"])
+            st.write(case["lesson"])
+
 # ================= TITLE =================
 st.title(" Digital Literacy Assistant")
 st.markdown(
@@ -82,11 +193,22 @@ if page == "🔍 Analyze Text":
             user_text = process_uploaded_file(uploaded)
 
     if st.button(" Analyze", type="primary") and user_text:
-        result = analyze_message(user_text)
+        text_hash = hashlib.sha1(user_text.encode("utf-8")).hexdigest()
+
+        # Same text as this session's last analysis: skip even the cache lookup
+        if st.session_state.last_analysis_hash == text_hash:
+            result = st.session_state.last_analysis_result
+        else:
+            result = cached_analyze_message(text_hash, user_text)
 
-        if not result["success"]:
-            st.error(result["error"])
-            st.stop()
+            if result["success"]:
+                st.session_state.last_analysis_hash = text_hash
+                st.session_state.last_analysis_result = result
+            else:
+                # Don't keep failures around for the whole TTL
+                cached_analyze_message.clear(text_hash, user_text)
+                st.error(result["error"])
+                st.stop()
 
         data = result["data"]
 
@@ -140,6 +262,9 @@ if page == "🔍 Analyze Text":
 
                 with st.expander(f"{emoji} URL {i}: {u.get('url','Unknown')}"):
                     st.metric("Risk Score", f"{risk}/100")
+                    url_safe = sb.get("url_results", {}).get(u.get("url"))
+                    if url_safe is False:
+                        st.error("Flagged by Google Safe Browsing")
                     st.write("**Domain:**", u.get("domain", "Unknown"))
                     st.write("**Protocol:**", u.get("scheme", "Unknown"))
 
@@ -209,63 +334,13 @@ elif page == "📖 Learn More":
         """)
 
     with l2:
-        if not st.session_state.quiz_mode:
-            if st.button("▶ Start Quiz"):
-                st.session_state.quiz_mode = True
-                st.session_state.current_quiz = random.choice(QUIZ_EXAMPLES)
-                st.session_state.quiz_revealed = False
-                st.rerun()
-        else:
-            quiz = st.session_state.current_quiz
-            st.markdown(f"**Message:**\n\n{quiz['text']}")
-
-            if st.button("Reveal Answer"):
-                st.session_state.quiz_revealed = True
-                st.session_state.quizzes_taken += 1
-                st.session_state.quiz_score += quiz.get("risk_score", 0)
-                st.rerun()
-
-            if st.session_state.quiz_revealed:
-                st.info(
-                    quiz.get("explanation") or
-                    quiz.get("reason") or
-                    "This message contains common scam indicators."
-                )
-
-                if st.button("➡ Next Question"):
-                    st.session_state.current_quiz = random.choice(QUIZ_EXAMPLES)
-                    st.session_state.quiz_revealed = False
-                    st.rerun()
+        quiz_tab()
 
     with l3:
-        example = random.choice(COMPARISON_EXAMPLES)
-        c1, c2 = st.columns(2)
-        with c1:
-            st.error(example["suspicious"])
-        with c2:
-            st.success(example["legitimate"])
+        compare_tab()
 
     with l4:
-        st.subheader("🔗 URL Safety Education")
-        for tip in URL_SAFETY_TIPS["basic_checks"]:
-            st.markdown(f"- {tip}")
-
-        quiz = random.choice(URL_QUIZ_EXAMPLES)
-        st.success(f"Legitimate: {quiz['legitimate']}")
-        st.error(f"Phishing: {quiz['phishing']}")
-
-        with st.expander("Why is this dangerous?"):
-            st.write(
-                quiz.get(
-                    "explanation",
-                    "This URL uses deceptive patterns common in phishing attacks."
-                )
-            )
-
-        for case in PHISHING_CASE_STUDIES:
-            with st.expander(case["title"]):
-                st.warning(case["phishing_url"])
-                st.write(case["lesson"])
+        url_safety_tab()
 
 # ================= FOOTER =================
 st.markdown("---")
@@ -1,19 +1,32 @@
+import os
 import pandas as pd
 
-# Load raw dataset
-df = pd.read_csv("spam.csv", encoding="latin-1")
+# Absolute path to this file's directory (ml/)
+BASE_DIR = os.path.dirname(__file__)
 
-# Keep only needed columns
-df = df[["v1", "v2"]]
+# Load raw dataset (only the label and message columns)
+df = pd.read_csv(
+    os.path.join(BASE_DIR, "spam.csv"),
+    encoding="latin-1",
+    usecols=["v1", "v2"],
+    dtype={"v2": "string[pyarrow]"}
+)
+
+# Rename columns
 df.columns = ["label", "message"]
 
 # Convert labels
 df["label"] = df["label"].map({
     "spam": "scam",
     "ham": "safe"
-})
+}).astype("category")
 
-# Save cleaned dataset
-df.to_csv("dataset.csv", index=False)
+# Save cleaned dataset as Parquet: columnar, so train.py skips CSV parsing
+df.to_parquet(
+    os.path.join(BASE_DIR, "dataset.parquet"),
+    engine="pyarrow",
+    compression="zstd",
+    index=False
+)
 
-print("✅ dataset.csv created successfully")
+print("✅ dataset.parquet created successfully")
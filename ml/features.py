@@ -0,0 +1,135 @@
+from functools import lru_cache
+
+import numpy as np
+
+from utils.simple_language_processor import SimpleLanguageProcessor
+
+# Column order of the language features appended to the TF-IDF vector
+LANG_FEATURES = ["en_words", "hi_words", "mr_words"]
+
+_processor = SimpleLanguageProcessor()
+
+
+def compute_lang_counts(text):
+    """
+    English, Hindi, Marathi word counts for a single message.
+    Returns: (en, hi, mr)
+    """
+    counts = _processor.detect_mixed_language(str(text))
+    return counts["en"], counts["hi"], counts["mr"]
+
+
+# ================= BATCH (TRAINING) =================
+@lru_cache(maxsize=1)
+def _numba_counter():
+    """
+    Compile the Numba word counter on first use.
+    Returns None if numba isn't installed; inference never needs it.
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(parallel=True, cache=True)
+    def count_langs(cp, is_word, offsets):
+        """
+        Per-message (en, hi) word counts, one message per parallel worker.
+        """
+        n = len(offsets) - 1
+        en = np.zeros(n, dtype=np.int64)
+        hi = np.zeros(n, dtype=np.int64)
+
+        for m in prange(n):
+            has_deva = False
+            has_latin = False
+            for i in range(offsets[m], offsets[m + 1]):
+                c = cp[i]
+                if is_word[i]:
+                    has_deva |= (c >= 0x0900) & (c <= 0x097F)
+                    has_latin |= ((c >= 0x41) & (c <= 0x5A)) | ((c >= 0x61) & (c <= 0x7A))
+                    # Word continues unless this is the message's last codepoint
+                    if i + 1 < offsets[m + 1] and is_word[i + 1]:
+                        continue
+                    hi[m] += has_deva
+                    en[m] += (not has_deva) & has_latin
+                    has_deva = False
+                    has_latin = False
+
+        return en, hi
+
+    return count_langs
+
+
+def _count_langs_numpy(cp, is_word, msg_id, n):
+    """
+    Per-message (en, hi) word counts using bincount over word ids.
+    """
+    is_deva = (cp >= 0x0900) & (cp <= 0x097F)
+    is_latin = ((cp >= 0x41) & (cp <= 0x5A)) | ((cp >= 0x61) & (cp <= 0x7A))
+
+    # Word ids for every word codepoint
+    starts = is_word & ~np.concatenate(([False], is_word[:-1]))
+    word_id = np.cumsum(starts)[is_word] - 1
+    n_words = int(starts.sum())
+
+    word_deva = np.bincount(word_id, weights=is_deva[is_word], minlength=n_words) > 0
+    word_latin = np.bincount(word_id, weights=is_latin[is_word], minlength=n_words) > 0
+    word_msg = msg_id[starts]
+
+    hi = np.bincount(word_msg, weights=word_deva, minlength=n).astype(int)
+    en = np.bincount(word_msg, weights=~word_deva & word_latin, minlength=n).astype(int)
+    return en, hi
+
+
+def add_language_features(df):
+    """
+    Adds English, Hindi, Marathi word counts as numeric features.
+
+    Same counts as compute_lang_counts, but computed over the whole
+    column at once on a codepoint array instead of message by message.
+    Uses a Numba kernel when available.
+    """
+    # map(str) like compute_lang_counts: missing values become "nan"/"None".
+    # astype(str) can keep them missing, and .str.cat would drop them.
+    messages = df["message"].map(str)
+    n = len(messages)
+
+    if n == 0:
+        for col in LANG_FEATURES:
+            df[col] = 0
+        return df
+
+    # One codepoint buffer for the whole column; "\n" separates messages
+    joined = messages.str.cat(sep="\n")
+    cp = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+
+    # Start offset of every message (plus the end of the buffer)
+    lengths = messages.str.len().to_numpy(dtype=np.int64) + 1
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    # The Numba kernel has no bounds checks: offsets must line up with cp
+    assert len(offsets) - 1 == n and offsets[-1] == len(cp) + 1
+    offsets[-1] = len(cp)
+
+    # \w+ tokenisation: classify each distinct codepoint once
+    uniq, inverse = np.unique(cp, return_inverse=True)
+    word_table = np.fromiter(
+        (chr(c).isalnum() or c == 0x5F for c in uniq.tolist()),
+        dtype=bool,
+        count=len(uniq)
+    )
+    is_word = word_table[inverse]
+
+    count_langs = _numba_counter()
+    if count_langs is not None:
+        en_words, hi_words = count_langs(cp, is_word, offsets)
+    else:
+        msg_id = np.repeat(np.arange(n), lengths)[: len(cp)]
+        en_words, hi_words = _count_langs_numpy(cp, is_word, msg_id, n)
+
+    df["en_words"] = en_words
+    # Devanagari words are counted as both Hindi and Marathi
+    df["hi_words"] = hi_words
+    df["mr_words"] = hi_words
+
+    return df
@@ -1,6 +1,10 @@
-
 import os
-import pickle
+import joblib
+import numpy as np
+from functools import lru_cache
+from scipy.sparse import csr_matrix, hstack
+
+from ml.features import compute_lang_counts
 
 # Absolute path to this file's directory (ml/)
 BASE_DIR = os.path.dirname(__file__)
@@ -8,12 +12,66 @@ BASE_DIR = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(BASE_DIR, "model.pkl")
 VECTORIZER_PATH = os.path.join(BASE_DIR, "vectorizer.pkl")
 
-model = pickle.load(open(MODEL_PATH, "rb"))
-vectorizer = pickle.load(open(VECTORIZER_PATH, "rb"))
+
+@lru_cache(maxsize=1)
+def _load_artifacts():
+    """
+    Load the trained model and vectorizer once per process.
+    Deferred until the first prediction so importing this module stays cheap.
+    """
+    # mmap_mode keeps numpy arrays on disk, shared via the OS page cache
+    model = joblib.load(MODEL_PATH, mmap_mode="r")
+    vectorizer = joblib.load(VECTORIZER_PATH, mmap_mode="r")
+    return model, vectorizer
+
+
+@lru_cache(maxsize=1)
+def _load_weights():
+    """
+    Dense (n_features, n_classes) weights, bias and class labels taken
+    from the LogisticRegression, so prediction is a plain matmul plus
+    softmax without sklearn's per-call validation.
+    """
+    model, _ = _load_artifacts()
+    coef = np.asarray(model.coef_, dtype=np.float32)
+    intercept = np.asarray(model.intercept_, dtype=np.float32)
+
+    # Binary models store one row for the positive class; a zero logit
+    # for the negative class makes softmax equal sklearn's sigmoid
+    if len(model.classes_) == 2:
+        coef = np.vstack([np.zeros_like(coef), coef])
+        intercept = np.concatenate([np.zeros_like(intercept), intercept])
+
+    return np.ascontiguousarray(coef.T), intercept, np.asarray(model.classes_)
+
+
+def predict_messages(texts):
+    """
+    Classify several messages with a single vectorizer/model pass.
+    Returns aligned (labels, confidences) lists.
+    """
+    _, vectorizer = _load_artifacts()
+    W, b, classes = _load_weights()
+
+    # Same layout as training: TF-IDF columns followed by language counts
+    lang = np.array([compute_lang_counts(t) for t in texts], dtype=np.float32)
+    vec = hstack([
+        vectorizer.transform(texts).astype(np.float32),
+        csr_matrix(lang)
+    ], format="csr")
+    # float64 from here on so rounded confidences come out exact
+    logits = np.asarray(vec @ W, dtype=np.float64) + b
+
+    # Numerically stable softmax
+    logits -= logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+
+    labels = classes[probs.argmax(axis=1)]
+    confidences = (probs.max(axis=1) * 100).round(2)
+    return labels.tolist(), confidences.tolist()
+
 
 def predict_message(text):
-    vec = vectorizer.transform([text])
-    probs = model.predict_proba(vec)[0]
-    label = model.classes_[probs.argmax()]
-    confidence = round(max(probs) * 100, 2)
-    return label, confidence
+    labels, confidences = predict_messages([text])
+    return labels[0], confidences[0]
@@ -1,58 +1,35 @@
 import os
+import numpy as np
 import pandas as pd
-import pickle
+import joblib
 
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 
-from scipy.sparse import hstack
+from scipy.sparse import csr_matrix, hstack
 
-# 👇 import your language detector
-from utils.simple_language_processor import SimpleLanguageProcessor
+from ml.features import LANG_FEATURES, add_language_features
 
 
 # ================= PATHS =================
 BASE_DIR = os.path.dirname(__file__)
 
-DATASET_PATH = os.path.join(BASE_DIR, "dataset.csv")
+DATASET_PATH = os.path.join(BASE_DIR, "dataset.parquet")
 MODEL_PATH = os.path.join(BASE_DIR, "model.pkl")
 VECTORIZER_PATH = os.path.join(BASE_DIR, "vectorizer.pkl")
 
 
-# ================= LANGUAGE FEATURES =================
-def add_language_features(df):
-    """
-    Adds English, Hindi, Marathi word counts as numeric features
-    """
-    processor = SimpleLanguageProcessor()
-
-    en_words = []
-    hi_words = []
-    mr_words = []
-
-    for text in df["message"]:
-        counts = processor.detect_mixed_language(str(text))
-        en_words.append(counts.get("en", 0))
-        hi_words.append(counts.get("hi", 0))
-        mr_words.append(counts.get("mr", 0))
-
-    df["en_words"] = en_words
-    df["hi_words"] = hi_words
-    df["mr_words"] = mr_words
-
-    return df
-
-
 # ================= LOAD DATA =================
-df = pd.read_csv(DATASET_PATH)
+df = pd.read_parquet(DATASET_PATH)
 
 # Add language features
 df = add_language_features(df)
 
 X_text = df["message"]
-X_lang = df[["en_words", "hi_words", "mr_words"]]
+X_lang = df[LANG_FEATURES]
 y = df["label"]
 
 
@@ -67,10 +44,17 @@ X_text_train, X_text_test, X_lang_train, X_lang_test, y_train, y_test = train_te
 
 
 # ================= TF-IDF =================
-vectorizer = TfidfVectorizer(
-    stop_words="english",
-    max_features=5000,
-    ngram_range=(1, 2)
+# Hashing trick instead of a learned vocabulary: the pickled vectorizer
+# only holds the IDF weights, so it stays small and fast to load
+vectorizer = make_pipeline(
+    HashingVectorizer(
+        stop_words="english",
+        n_features=2 ** 14,
+        ngram_range=(1, 2),
+        alternate_sign=False,
+        norm=None
+    ),
+    TfidfTransformer()
 )
 
 X_text_train_vec = vectorizer.fit_transform(X_text_train)
@@ -78,14 +62,28 @@ X_text_test_vec = vectorizer.transform(X_text_test)
 
 
 # ================= COMBINE FEATURES =================
-X_train_final = hstack([X_text_train_vec, X_lang_train.values])
-X_test_final = hstack([X_text_test_vec, X_lang_test.values])
+# Keep everything CSR float32 so LogisticRegression needn't convert
+X_train_final = hstack([
+    X_text_train_vec.astype(np.float32),
+    csr_matrix(X_lang_train.values.astype(np.float32))
+], format="csr")
+X_test_final = hstack([
+    X_text_test_vec.astype(np.float32),
+    csr_matrix(X_lang_test.values.astype(np.float32))
+], format="csr")
 
 
 # ================= MODEL =================
-model = LogisticRegression(max_iter=1000)
+# Weaker regularisation than the default: the hashed feature space is
+# wider than the old 5000-term vocabulary and C=1 underfits it
+model = LogisticRegression(max_iter=1000, C=10)
 model.fit(X_train_final, y_train)
 
+# float32 weights halve model size and memory traffic at inference;
+# the accuracy below is measured on the cast model
+model.coef_ = model.coef_.astype(np.float32)
+model.intercept_ = model.intercept_.astype(np.float32)
+
 
 # ================= EVALUATION =================
 y_pred = model.predict(X_test_final)
@@ -93,7 +91,8 @@ print("✅ Accuracy:", accuracy_score(y_test, y_pred))
 
 
 # ================= SAVE =================
-pickle.dump(model, open(MODEL_PATH, "wb"))
-pickle.dump(vectorizer, open(VECTORIZER_PATH, "wb"))
+# Uncompressed joblib files so predict.py can memory-map the arrays
+joblib.dump(model, MODEL_PATH, compress=0)
+joblib.dump(vectorizer, VECTORIZER_PATH, compress=0)
 
 print("✅ model.pkl and vectorizer.pkl saved in ml/")
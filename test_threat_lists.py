@@ -0,0 +1,110 @@
+import base64
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+
+from utils.threat_list_cache import ThreatListCache, canonicalize, url_expressions
+
+
+def checksum(prefixes):
+    return {"sha256": base64.b64encode(hashlib.sha256(b"".join(prefixes)).digest()).decode()}
+
+
+def raw(prefixes):
+    return {"rawHashes": {"prefixSize": 4, "rawHashes": base64.b64encode(b"".join(prefixes)).decode()}}
+
+
+# Full update, then a partial update removing by index into the sorted list
+a, b, c = b"aaaa", b"bbbb", b"cccc"
+full = ThreatListCache._apply_update(None, {
+    "responseType": "FULL_UPDATE",
+    "additions": [raw([c, a, b])],
+    "checksum": checksum([a, b, c])
+})
+print("Full update:", full)
+assert full == [a, b, c]
+
+partial = ThreatListCache._apply_update({"prefixes": full}, {
+    "responseType": "PARTIAL_UPDATE",
+    "removals": [{"rawIndices": {"indices": [0, 2]}}],
+    "additions": [raw([b"dddd"])],
+    "checksum": checksum([b, b"dddd"])
+})
+print("Partial update:", partial)
+assert partial == [b, b"dddd"]
+
+# Checksum mismatch means the list has to be fetched from scratch
+mismatch = ThreatListCache._apply_update({"prefixes": full}, {
+    "responseType": "PARTIAL_UPDATE",
+    "removals": [{"rawIndices": {"indices": [1]}}],
+    "checksum": checksum([a, b, c])
+})
+print("Checksum mismatch:", mismatch)
+assert mismatch is None
+
+# Canonicalization examples from the Safe Browsing v4 docs
+cases = {
+    "http://host/%25%32%35": "http://host/%25",
+    "http://www.google.com/blah/..": "http://www.google.com/",
+    "http://www.GOOgle.com/": "http://www.google.com/",
+    "http://www.google.com.../": "http://www.google.com/",
+    "http://host.com//twoslashes?more//slashes": "http://host.com/twoslashes?more//slashes",
+    "www.google.com/": "http://www.google.com/",
+    "http://www.google.com/q?r?": "http://www.google.com/q?r?",
+    "http://evil.com/foo#bar#baz": "http://evil.com/foo",
+}
+for url, expected in cases.items():
+    print(f"{url} -> {canonicalize(url)}")
+    assert canonicalize(url) == expected
+
+# Suffix/prefix expressions
+expressions = url_expressions("http://a.b.c/1/2.html?param=1")
+print("Expressions:", expressions)
+assert set(expressions) == {
+    "a.b.c/1/2.html?param=1", "a.b.c/1/2.html", "a.b.c/", "a.b.c/1/",
+    "b.c/1/2.html?param=1", "b.c/1/2.html", "b.c/", "b.c/1/",
+}
+assert set(url_expressions("http://a.b.c.d.e.f.g/1.html")) == {
+    "a.b.c.d.e.f.g/1.html", "a.b.c.d.e.f.g/",
+    "c.d.e.f.g/1.html", "c.d.e.f.g/", "d.e.f.g/1.html", "d.e.f.g/",
+    "e.f.g/1.html", "e.f.g/", "f.g/1.html", "f.g/",
+}
+assert set(url_expressions("http://1.2.3.4/1/")) == {"1.2.3.4/1/", "1.2.3.4/"}
+
+# Persisted lists are only trusted while they are fresh
+with tempfile.TemporaryDirectory() as tmp:
+    db_path = os.path.join(tmp, "threat_lists.sqlite3")
+
+    # A file without fetch times is discarded
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("CREATE TABLE threat_lists (threat_type TEXT PRIMARY KEY, state TEXT, prefixes BLOB)")
+        conn.executemany(
+            "INSERT INTO threat_lists VALUES (?, ?, ?)",
+            [(t, "s", b"") for t in ThreatListCache.THREAT_TYPES]
+        )
+    conn.close()
+    print("Old file ready:", ThreatListCache(api_key="test", db_path=db_path).ready)
+    assert not ThreatListCache(api_key="test", db_path=db_path).ready
+
+    def write_lists(updated_at):
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("DELETE FROM threat_lists")
+            conn.executemany(
+                "INSERT INTO threat_lists VALUES (?, ?, ?, ?)",
+                [(t, "s", b"", updated_at) for t in ThreatListCache.THREAT_TYPES]
+            )
+        conn.close()
+
+    write_lists(time.time() - 3 * ThreatListCache.MAX_AGE_SECONDS)
+    print("Stale lists ready:", ThreatListCache(api_key="test", db_path=db_path).ready)
+    assert not ThreatListCache(api_key="test", db_path=db_path).ready
+
+    write_lists(time.time())
+    print("Fresh lists ready:", ThreatListCache(api_key="test", db_path=db_path).ready)
+    assert ThreatListCache(api_key="test", db_path=db_path).ready
+
+print("\nAll threat list checks passed")
@@ -14,4 +14,43 @@ for url in urls:
     result = URLAnalyzer.analyze_url_structure(url)
     print(f"\nURL: {url}")
     print(f"Risk Score: {result['risk_score']}/100")
-    print(f"Safe: {result['is_safe']}")
\ No newline at end of file
+    print(f"Safe: {result['is_safe']}")
+
+# Case studies go through the same extraction as the real pipeline
+from data.url_examples import PHISHING_CASE_STUDIES
+
+for case in PHISHING_CASE_STUDIES:
+    urls = URLAnalyzer.extract_urls(case["phishing_url"])
+    assert len(urls) == 1, urls
+    result = URLAnalyzer.analyze_url_structure(urls[0])
+    flags = [flag["flag"] for flag in result["red_flags"]]
+    print(f"\n{case['title']}: {urls[0]}")
+    print(f"Risk Score: {result['risk_score']}/100")
+    print(f"Red Flags: {', '.join(flags)}")
+    if case["technique"] == "Unicode Character Substitution":
+        assert "Lookalike Unicode Characters" in flags
+
+# A directory URL keeps its trailing slash, so a directory-level
+# threat list entry still matches
+from utils.threat_list_cache import url_expressions
+
+urls = URLAnalyzer.extract_urls("Login at http://compromised.com/wp-content/phish/ today")
+print("\nDirectory URL:", urls)
+assert urls == ["http://compromised.com/wp-content/phish/"]
+assert "compromised.com/wp-content/phish/" in url_expressions(urls[0])
+
+# Sentences in other scripts joined by a period are not domains
+urls = URLAnalyzer.extract_urls("कृपया शेयर करें.धन्यवाद")
+print("Hindi text:", urls)
+assert urls == []
+
+# Unicode spaces end a URL with either regex engine (re2 or stdlib re)
+import re
+from utils.url_analyzer import _URL_RE
+
+text = "Open www.example.com/path\u00a0now or www.example.org/a\u2009b"
+urls = URLAnalyzer.extract_urls(text)
+print("Unicode spaces:", urls)
+assert urls == ["http://www.example.com/path", "http://www.example.org/a"]
+stdlib_matches = [m.group(0) for m in re.compile(_URL_RE.pattern).finditer(text)]
+assert stdlib_matches == [m.group(0) for m in _URL_RE.finditer(text)]
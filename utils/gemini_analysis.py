@@ -1,7 +1,19 @@
 from google import genai
+from functools import lru_cache
+import asyncio
 import json
 import os
 
+
+@lru_cache(maxsize=1)
+def get_client():
+    """
+    Returns a shared Gemini client, created once per process so its
+    HTTP transport is reused across analyses.
+    """
+    return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+
 def analyze_text(text):
     """
     Analyzes text using Gemini AI for scams, misinformation, and manipulation.
@@ -95,8 +107,8 @@ Be thorough and accurate. If the text seems safe, reflect that in low scores. Do
 """
     
     try:
-        # Initialize client
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        # Shared client
+        client = get_client()
         
         # DEBUG: List available models
         print("=== Available Models ===")
@@ -267,32 +279,64 @@ def create_annotated_text_html(original_text, suspicious_phrases):
     return html_content
 
 
-def analyze_text_with_urls(text):
+@lru_cache(maxsize=1)
+def get_safe_browsing_checker():
     """
-    Enhanced analysis that includes URL checking
+    Returns a shared SafeBrowsingChecker instance, backed by a local
+    threat list copy that refreshes in the background.
+    Raises ValueError (not cached) if no API key is configured.
     """
-    from utils.url_analyzer import URLAnalyzer
     from utils.safe_browsing_checker import SafeBrowsingChecker
+    from utils.threat_list_cache import ThreatListCache
+    
+    threat_lists = ThreatListCache()
+    threat_lists.start()
+    return SafeBrowsingChecker(threat_lists=threat_lists)
+
+
+def _analyze_urls(text):
+    """
+    URL structure analysis plus Safe Browsing check for the URLs in text.
+    Returns (urls, url_analyses, sb_result), or None if there are no URLs.
+    """
+    from utils.url_analyzer import URLAnalyzer
+    
+    urls = URLAnalyzer.extract_urls(text)
+    if not urls:
+        return None
+    
+    # Parse each URL once for both checks below
+    contexts = URLAnalyzer.build_contexts(urls)
+    
+    # Analyze URL structure
+    url_analyses = URLAnalyzer.batch_analyze_urls(contexts)
     
-    # Get standard Gemini analysis
-    result = analyze_text(text)
+    # Check against Safe Browsing (if API key available)
+    try:
+        sb_checker = get_safe_browsing_checker()
+        sb_result = sb_checker.check_urls(contexts)
+    except Exception as e:
+        sb_result = {"error": str(e), "safe": None}
+    
+    return urls, url_analyses, sb_result
+
+
+async def analyze_text_with_urls_async(text):
+    """
+    Enhanced analysis that includes URL checking.
+    The Gemini call and the URL checks are independent, so they run
+    concurrently in worker threads.
+    """
+    result, url_check = await asyncio.gather(
+        asyncio.to_thread(analyze_text, text),
+        asyncio.to_thread(_analyze_urls, text)
+    )
     
     if not result["success"]:
         return result
     
-    # Extract and analyze URLs
-    urls = URLAnalyzer.extract_urls(text)
-    
-    if urls:
-        # Analyze URL structure
-        url_analyses = URLAnalyzer.batch_analyze_urls(urls)
-        
-        # Check against Safe Browsing (if API key available)
-        try:
-            sb_checker = SafeBrowsingChecker()
-            sb_result = sb_checker.check_urls(urls)
-        except Exception as e:
-            sb_result = {"error": str(e), "safe": None}
+    if url_check:
+        urls, url_analyses, sb_result = url_check
         
         # Add URL analysis to result
         result["data"]["urls_found"] = len(urls)
@@ -316,4 +360,11 @@ def analyze_text_with_urls(text):
                     "explanation": f"URL scored {url_analysis['risk_score']}/100 risk"
                 })
     
-    return result
\ No newline at end of file
+    return result
+
+
+def analyze_text_with_urls(text):
+    """
+    Synchronous wrapper around analyze_text_with_urls_async.
+    """
+    return asyncio.run(analyze_text_with_urls_async(text))
@@ -1,4 +1,10 @@
-import re
+# Devanagari block (Hindi / Marathi)
+_DEVA_START = 0x0900
+_DEVA_END = 0x097F
+
+# Vowel signs "े" and "ो", common in Marathi
+_MARATHI_MARKERS = frozenset('ेो')
+
 
 class SimpleLanguageProcessor:
     def detect_mixed_language(self, text):
@@ -12,19 +18,29 @@ class SimpleLanguageProcessor:
         words = text.split()
         
         for word in words:
-            # Check if word has Devanagari (Hindi/Marathi)
-            if re.search(r'[\u0900-\u097F]', word):
-                # Simple check - if it contains common Marathi ending "े" or "ो"
-                if 'े' in word or 'ो' in word:  # Common in Marathi
+            # Single scan per word instead of one regex / `in` test per check
+            deva = 0
+            latin = 0
+            marathi = False
+            for ch in word:
+                code = ord(ch)
+                if _DEVA_START <= code <= _DEVA_END:
+                    deva += 1
+                    if ch in _MARATHI_MARKERS:
+                        marathi = True
+                elif ch.isascii() and ch.isalpha():
+                    latin += 1
+
+            # Word has Devanagari (Hindi/Marathi). Mixed words like
+            # "helloकैसे" land here too, since Devanagari is checked first.
+            if deva:
+                # Simple check - common Marathi endings "े" or "ो"
+                if marathi:
                     result['mr'] += 1
                 else:
                     result['hi'] += 1
-            # Check if word is English (only A-Z, a-z)
-            elif re.match(r'^[A-Za-z]+$', word):
+            # English (only A-Z, a-z)
+            elif latin == len(word):
                 result['en'] += 1
-            # Mixed word (like "helloकैसे")
-            elif re.search(r'[A-Za-z]', word) and re.search(r'[\u0900-\u097F]', word):
-                result['en'] += 0.5
-                result['hi'] += 0.5  # Count as both
         
-        return result
\ No newline at end of file
+        return result
@@ -1,11 +1,23 @@
-import requests
+import aiohttp
+import asyncio
 import os
-from typing import List, Dict
+import threading
+import weakref
+from cachetools import TTLCache
+from typing import List, Dict, Union
+
+from utils.threat_list_cache import ThreatListCache
+from utils.url_analyzer import URLAnalyzer, UrlContext
 
 class SafeBrowsingChecker:
     """
     Interface with Google Safe Browsing API to check URL safety.
     Detects malware, phishing, unwanted software, and social engineering.
+    
+    Can be used as an async context manager to keep one HTTP session
+    (and its keep-alive connections) open across several checks. The
+    synchronous API keeps its own pooled session on a background event
+    loop for the same reason.
     """
     
     BASE_URL = "https://safebrowsing.googleapis.com/v4/threatMatches:find"
@@ -24,10 +36,39 @@ class SafeBrowsingChecker:
     # Threat entry types
     THREAT_ENTRY_TYPES = ["URL"]
     
-    def __init__(self, api_key: str = None):
+    # Safe Browsing accepts at most 500 threat entries per request
+    MAX_URLS_PER_REQUEST = 500
+    
+    # Retries for 429 / 5xx responses, with exponential backoff
+    MAX_RETRIES = 3
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    TIMEOUT_SECONDS = 10
+    
+    # Open connections per session; idle ones are kept alive for reuse
+    MAX_CONNECTIONS = 20
+    
+    # Verdict cache. Threat verdicts expire sooner so a cleaned-up site
+    # isn't reported as dangerous for long.
+    CACHE_SIZE = 10_000
+    SAFE_TTL_SECONDS = 1800
+    THREAT_TTL_SECONDS = 300
+    
+    def __init__(
+        self,
+        api_key: str = None,
+        threat_lists: ThreatListCache = None,
+        strict: bool = False
+    ):
         """
         Initialize with Google Safe Browsing API key.
         If no key provided, tries to get from environment.
+        
+        threat_lists: optional local copy of the threat lists. Once it is
+        ready, URLs it rules out are reported safe without an API call.
+        
+        strict: check every URL. By default URLs on one of
+        URLAnalyzer.LEGITIMATE_DOMAINS are reported safe without a lookup.
         """
         self.api_key = api_key or os.getenv("SAFE_BROWSING_API_KEY")
         
@@ -36,6 +77,83 @@ class SafeBrowsingChecker:
                 "Safe Browsing API key not found. "
                 "Set SAFE_BROWSING_API_KEY in .env or pass api_key parameter"
             )
+        
+        self.threat_lists = threat_lists
+        self.strict = strict
+        
+        # Open only inside `async with`; otherwise each check uses its own
+        self._session = None
+        
+        # Sync API: background event loop and the pooled session bound to it
+        self._loop = None
+        self._loop_state = {"loop": None, "session": None}
+        self._loop_lock = threading.Lock()
+        self._finalizer = None
+        
+        # Canonical URL -> [] (safe) or list of threats
+        self._safe_cache = TTLCache(maxsize=self.CACHE_SIZE, ttl=self.SAFE_TTL_SECONDS)
+        self._threat_cache = TTLCache(maxsize=self.CACHE_SIZE, ttl=self.THREAT_TTL_SECONDS)
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._local_negatives = 0
+        self._trusted_skips = 0
+    
+    async def __aenter__(self):
+        self._session = self._new_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+    
+    def _new_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.MAX_CONNECTIONS),
+            timeout=aiohttp.ClientTimeout(total=self.TIMEOUT_SECONDS)
+        )
+    
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Event loop the sync API runs on, started on first use. A session
+        can't outlive its loop, so one long-lived loop is what lets
+        check_urls reuse connections between calls.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_state = {"loop": self._loop, "session": None}
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="safe-browsing",
+                    daemon=True
+                ).start()
+                # Also runs at interpreter exit if close() never was
+                self._finalizer = weakref.finalize(self, _shutdown_loop, self._loop_state)
+            return self._loop
+    
+    def _pooled_session(self):
+        """
+        Session to reuse for this call, or None to open a one-off session.
+        """
+        if self._session is not None:
+            return self._session
+        if asyncio.get_running_loop() is self._loop:
+            # Only ever touched from the background loop's thread
+            if self._loop_state["session"] is None:
+                self._loop_state["session"] = self._new_session()
+            return self._loop_state["session"]
+        return None
+    
+    def close(self):
+        """
+        Close the sync API's pooled session and stop its event loop.
+        """
+        with self._loop_lock:
+            finalizer, self._finalizer = self._finalizer, None
+            self._loop = None
+        if finalizer is not None:
+            finalizer()
     
     def check_url(self, url: str) -> Dict:
         """
@@ -44,9 +162,56 @@ class SafeBrowsingChecker:
         """
         return self.check_urls([url])
     
-    def check_urls(self, urls: List[str]) -> Dict:
+    def check_urls(self, urls: List[Union[str, UrlContext]], strict: bool = None) -> Dict:
+        """
+        Synchronous wrapper around check_urls_async.
+        Safe to call from several threads at once.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.check_urls_async(urls, strict), self._background_loop()
+        ).result()
+    
+    async def _post(self, session: aiohttp.ClientSession, urls: List[str]) -> Dict:
+        """
+        Send one threatMatches:find request for up to
+        MAX_URLS_PER_REQUEST URLs, retrying on 429 / 5xx.
+        Returns the parsed JSON response.
+        """
+        payload = {
+            "client": {
+                "clientId": "digital-literacy-assistant",
+                "clientVersion": "1.0.0"
+            },
+            "threatInfo": {
+                "threatTypes": self.THREAT_TYPES,
+                "platformTypes": self.PLATFORM_TYPES,
+                "threatEntryTypes": self.THREAT_ENTRY_TYPES,
+                "threatEntries": [{"url": url} for url in urls]
+            }
+        }
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            async with session.post(
+                self.BASE_URL,
+                params={"key": self.api_key},
+                json=payload
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                
+                if response.status not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                    raise SafeBrowsingAPIError(response.status, await response.text())
+            
+            await asyncio.sleep(2 ** attempt)
+    
+    async def check_urls_async(self, urls: List[Union[str, UrlContext]], strict: bool = None) -> Dict:
         """
         Check multiple URLs against Google Safe Browsing database.
+        URLs are sent in batches of MAX_URLS_PER_REQUEST, all in flight
+        concurrently. strict overrides the instance setting for this call.
+        
+        urls may also be contexts from URLAnalyzer.build_contexts, so the
+        URLs aren't parsed again.
         
         Returns:
             Dict with structure:
@@ -54,9 +219,16 @@ class SafeBrowsingChecker:
                 "safe": bool,
                 "threats": List of threat matches,
                 "checked_urls": List of URLs checked,
+                "url_results": Dict of url -> safe (bool),
                 "error": str (if any)
             }
         """
+        contexts = [
+            url if isinstance(url, UrlContext) else URLAnalyzer.build_context(url)
+            for url in urls
+        ]
+        urls = [context.url for context in contexts]
+        
         if not urls:
             return {
                 "safe": True,
@@ -66,80 +238,126 @@ class SafeBrowsingChecker:
             }
         
         try:
-            # Prepare request payload
-            payload = {
-                "client": {
-                    "clientId": "digital-literacy-assistant",
-                    "clientVersion": "1.0.0"
-                },
-                "threatInfo": {
-                    "threatTypes": self.THREAT_TYPES,
-                    "platformTypes": self.PLATFORM_TYPES,
-                    "threatEntryTypes": self.THREAT_ENTRY_TYPES,
-                    "threatEntries": [{"url": url} for url in urls]
-                }
-            }
+            # One entry per canonical URL: spelling variants share a verdict
+            keys = {context.url: context.canonical for context in contexts}
+            by_key = {}
+            for context in contexts:
+                by_key.setdefault(context.canonical, context)
             
-            # Make API request
-            response = requests.post(
-                f"{self.BASE_URL}?key={self.api_key}",
-                json=payload,
-                timeout=10
-            )
+            # Whitelisted domains are trusted unless the caller is strict
+            unique = list(by_key)
+            threats_by_key = {}
+            if not (self.strict if strict is None else strict):
+                for key in unique:
+                    if URLAnalyzer.is_legitimate_domain(by_key[key]):
+                        threats_by_key[key] = []
+                unique = [key for key in unique if key not in threats_by_key]
+            trusted = len(threats_by_key)
             
-            # Check response status
-            if response.status_code != 200:
-                return {
-                    "safe": False,
-                    "threats": [],
-                    "checked_urls": urls,
-                    "error": f"API Error: {response.status_code} - {response.text}"
-                }
+            # Serve what we can from the verdict cache
+            misses = []
+            with self._cache_lock:
+                for key in unique:
+                    if key in self._threat_cache:
+                        threats_by_key[key] = self._threat_cache[key]
+                    elif key in self._safe_cache:
+                        threats_by_key[key] = []
+                    else:
+                        misses.append(key)
+                self._trusted_skips += trusted
+                self._cache_hits += len(unique) - len(misses)
+                self._cache_misses += len(misses)
             
-            # Parse response
-            data = response.json()
+            # URLs matching no local hash prefix are on no threat list
+            if misses and self.threat_lists is not None and self.threat_lists.ready:
+                remote = []
+                for url in misses:
+                    if self._might_be_unsafe(url):
+                        remote.append(url)
+                    else:
+                        threats_by_key[url] = []
+                with self._cache_lock:
+                    self._local_negatives += len(misses) - len(remote)
+                misses = remote
             
-            # Check for matches
-            matches = data.get("matches", [])
+            if misses:
+                chunks = [
+                    misses[i:i + self.MAX_URLS_PER_REQUEST]
+                    for i in range(0, len(misses), self.MAX_URLS_PER_REQUEST)
+                ]
+                
+                # Make API requests
+                session = self._pooled_session()
+                if session is not None:
+                    responses = await asyncio.gather(
+                        *[self._post(session, chunk) for chunk in chunks]
+                    )
+                else:
+                    async with self._new_session() as session:
+                        responses = await asyncio.gather(
+                            *[self._post(session, chunk) for chunk in chunks]
+                        )
+                
+                # Format threat information per URL
+                fetched = {url: [] for url in misses}
+                for data in responses:
+                    for match in data.get("matches", []):
+                        threat_type = match.get("threatType", "UNKNOWN")
+                        platform_type = match.get("platformType", "UNKNOWN")
+                        threat_url = match.get("threat", {}).get("url", "")
+                        
+                        fetched.setdefault(threat_url, []).append({
+                            "url": threat_url,
+                            "threat_type": self._format_threat_type(threat_type),
+                            "platform": platform_type,
+                            "severity": self._get_severity(threat_type),
+                            "description": self._get_threat_description(threat_type)
+                        })
+                
+                with self._cache_lock:
+                    for url, url_threats in fetched.items():
+                        key = URLAnalyzer.canonicalize(url)
+                        if url_threats:
+                            self._threat_cache[key] = url_threats
+                        else:
+                            self._safe_cache[key] = []
+                        threats_by_key[key] = url_threats
             
-            if not matches:
+            threats = [t for url_threats in threats_by_key.values() for t in url_threats]
+            url_results = {url: not threats_by_key.get(keys[url]) for url in urls}
+            
+            if not threats:
                 return {
                     "safe": True,
                     "threats": [],
                     "checked_urls": urls,
+                    "url_results": url_results,
                     "message": "No threats detected"
                 }
             
-            # Format threat information
-            threats = []
-            for match in matches:
-                threat_type = match.get("threatType", "UNKNOWN")
-                platform_type = match.get("platformType", "UNKNOWN")
-                threat_url = match.get("threat", {}).get("url", "")
-                
-                threats.append({
-                    "url": threat_url,
-                    "threat_type": self._format_threat_type(threat_type),
-                    "platform": platform_type,
-                    "severity": self._get_severity(threat_type),
-                    "description": self._get_threat_description(threat_type)
-                })
-            
             return {
                 "safe": False,
                 "threats": threats,
                 "checked_urls": urls,
+                "url_results": url_results,
                 "message": f"Found {len(threats)} threat(s)"
             }
             
-        except requests.exceptions.Timeout:
+        except SafeBrowsingAPIError as e:
+            return {
+                "safe": False,
+                "threats": [],
+                "checked_urls": urls,
+                "error": f"API Error: {e.status} - {e.text}"
+            }
+        except asyncio.TimeoutError:
             return {
                 "safe": False,
                 "threats": [],
                 "checked_urls": urls,
                 "error": "Request timeout - Safe Browsing API did not respond"
             }
-        except requests.exceptions.RequestException as e:
+        except aiohttp.ClientError as e:
             return {
                 "safe": False,
                 "threats": [],
@@ -154,6 +372,29 @@ class SafeBrowsingChecker:
                 "error": f"Unexpected error: {str(e)}"
             }
     
+    def cache_stats(self) -> Dict:
+        """
+        Verdict cache counters, for monitoring hit rate.
+        """
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+                "local_negatives": self._local_negatives,
+                "trusted_skips": self._trusted_skips,
+                "cached_safe": len(self._safe_cache),
+                "cached_threats": len(self._threat_cache)
+            }
+    
+    def _might_be_unsafe(self, url: str) -> bool:
+        try:
+            return self.threat_lists.might_be_unsafe(url)
+        except ValueError:
+            # Unparseable URL: let the API decide
+            return True
+    
     @staticmethod
     def _format_threat_type(threat_type: str) -> str:
         """Format threat type for display"""
@@ -193,8 +434,8 @@ class SafeBrowsingChecker:
         Returns status information.
         """
         try:
-            # Test with a known safe URL
-            result = self.check_url("https://www.google.com")
+            # Test with a known safe URL (strict, or it would never be sent)
+            result = self.check_urls(["https://www.google.com"], strict=True)
             
             if "error" in result:
                 return {
@@ -211,4 +452,24 @@ class SafeBrowsingChecker:
             return {
                 "status": "error",
                 "message": f"Failed to connect: {str(e)}"
-            }
\ No newline at end of file
+            }
+
+
+def _shutdown_loop(state: Dict):
+    """
+    Close a checker's pooled session and stop its background loop.
+    Module-level so weakref.finalize doesn't keep the checker alive.
+    """
+    loop, session = state["loop"], state["session"]
+    if session is not None:
+        asyncio.run_coroutine_threadsafe(session.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+class SafeBrowsingAPIError(Exception):
+    """Non-200 response from the Safe Browsing API."""
+    
+    def __init__(self, status: int, text: str):
+        super().__init__(f"{status} - {text}")
+        self.status = status
+        self.text = text
@@ -1,17 +1,45 @@
-from ml.predict import predict_message
-from utils.gemini_analysis import analyze_text
+import asyncio
+import hashlib
+import threading
+from functools import lru_cache
 
-def analyze_message(user_text):
+from cachetools import LRUCache, cached
+
+from utils.gemini_analysis import analyze_text_with_urls_async
+
+
+@lru_cache(maxsize=None)
+def _get_predict():
+    # Imported on first use: ml.predict pulls in numpy / scipy / joblib
     from ml.predict import predict_message
-from utils.gemini_analysis import analyze_text_with_urls  # Changed import
+    return predict_message
 
-def analyze_message(user_text):
-    try:
-        # ML prediction
-        ml_label, ml_confidence = predict_message(user_text)
 
-        # Gemini + URL analysis
-        gemini_result = analyze_text_with_urls(user_text)  # Changed function
+def _normalize(text):
+    # The vectorizer lowercases and tokenizes on words, so case and
+    # whitespace changes don't change the prediction
+    return " ".join(text.split()).lower()
+
+
+def _text_key(text):
+    # Fixed-size key, so the cache doesn't hold on to long messages
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+@cached(LRUCache(maxsize=2048), key=_text_key, lock=threading.Lock())
+def _cached_predict(normalized_text):
+    return _get_predict()(normalized_text)
+
+
+async def analyze_message_async(user_text):
+    try:
+        # ML prediction (local CPU) and Gemini + URL analysis (network)
+        # are independent, so run them concurrently.
+        # Forwarded scams repeat verbatim, so the prediction is cached.
+        (ml_label, ml_confidence), gemini_result = await asyncio.gather(
+            asyncio.to_thread(_cached_predict, _normalize(user_text)),
+            analyze_text_with_urls_async(user_text)
+        )
 
         if not gemini_result["success"]:
             return gemini_result
@@ -38,4 +66,11 @@ def analyze_message(user_text):
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+def analyze_message(user_text):
+    """
+    Synchronous wrapper around analyze_message_async.
+    """
+    return asyncio.run(analyze_message_async(user_text))
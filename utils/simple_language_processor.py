@@ -1,5 +1,14 @@
 import re
 
+_WORD_RE = re.compile(r'\w+')
+_DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
+_LATIN_RE = re.compile(r'[A-Za-z]')
+
+# ASCII-only text has no Devanagari, so the English count is just the
+# number of \w+ words with a letter, found in one pass with no per-word loop
+_ASCII_LATIN_WORD_RE = re.compile(r'[0-9_]*[A-Za-z]\w*', re.ASCII)
+
+
 class SimpleLanguageProcessor:
     """
     Very lightweight mixed-language detector
@@ -7,23 +16,27 @@ class SimpleLanguageProcessor:
     """
 
     def detect_mixed_language(self, text):
-        words = re.findall(r'\w+', text.lower())
-
         counts = {
             "en": 0,
             "hi": 0,
             "mr": 0
         }
 
-        for word in words:
+        if text.isascii():
+            counts["en"] = len(_ASCII_LATIN_WORD_RE.findall(text))
+            return counts
+
+        # No .lower() copy: Devanagari has no case and the Latin
+        # class covers both cases
+        for word in _WORD_RE.findall(text):
             # Hindi / Marathi (Devanagari Unicode range)
-            if re.search(r'[\u0900-\u097F]', word):
+            if _DEVANAGARI_RE.search(word):
                 # We count both as regional language
                 counts["hi"] += 1
                 counts["mr"] += 1
             else:
                 # English (basic heuristic)
-                if re.search(r'[a-z]', word):
+                if _LATIN_RE.search(word):
                     counts["en"] += 1
 
         return counts
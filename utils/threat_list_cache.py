@@ -0,0 +1,398 @@
+import base64
+import hashlib
+import os
+import posixpath
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ThreatListCache:
+    """
+    Local copy of the Google Safe Browsing threat lists (v4 Update API).
+
+    Keeps the SHA256 hash prefixes of every list in memory, refreshes them
+    on a background thread and persists them to sqlite. A URL whose
+    expressions match no prefix is safe without any network call; only
+    possible matches need to be confirmed with the Lookup API.
+    """
+
+    UPDATE_URL = "https://safebrowsing.googleapis.com/v4/threatListUpdates:fetch"
+
+    THREAT_TYPES = [
+        "MALWARE",
+        "SOCIAL_ENGINEERING",
+        "UNWANTED_SOFTWARE",
+        "POTENTIALLY_HARMFUL_APPLICATION"
+    ]
+    PLATFORM_TYPE = "ANY_PLATFORM"
+    THREAT_ENTRY_TYPE = "URL"
+
+    # Lookups only need this many leading bytes of each hash
+    PREFIX_SIZE = 4
+
+    UPDATE_INTERVAL_SECONDS = 1800
+    TIMEOUT_SECONDS = 30
+    
+    # Lists not refreshed within this long are not trusted any more
+    MAX_AGE_SECONDS = 2 * UPDATE_INTERVAL_SECONDS
+    
+    # Retries for 429 / 5xx responses, with exponential backoff
+    MAX_RETRIES = 3
+    RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+    def __init__(self, api_key: str = None, db_path: str = None):
+        self.api_key = api_key or os.getenv("SAFE_BROWSING_API_KEY")
+
+        if not self.api_key:
+            raise ValueError(
+                "Safe Browsing API key not found. "
+                "Set SAFE_BROWSING_API_KEY in .env or pass api_key parameter"
+            )
+
+        self.db_path = db_path or os.path.join(_cache_dir(), "threat_lists.sqlite3")
+
+        # threat type -> {"state": str, "prefixes": sorted list of bytes,
+        #                 "updated_at": unix time of the last fetch}
+        self._lists: Dict[str, Dict] = {}
+        # Leading PREFIX_SIZE bytes of every prefix across all lists
+        self._heads = frozenset()
+        self._lock = threading.Lock()
+
+        # Keep-alive session; update requests are retried by the adapter
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=self.MAX_RETRIES,
+                backoff_factor=0.3,
+                status_forcelist=self.RETRY_STATUSES,
+                allowed_methods=["POST"]
+            )
+        ))
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._wait_seconds = self.UPDATE_INTERVAL_SECONDS
+
+        self._load()
+
+    # ================= PUBLIC =================
+    @property
+    def ready(self) -> bool:
+        """
+        True while every threat list has been fetched recently enough.
+        Stale lists (e.g. updates keep failing) need the Lookup API again.
+        """
+        # Servers may ask for longer waits than our own interval
+        max_age = max(self.MAX_AGE_SECONDS, 2 * self._wait_seconds)
+        now = time.time()
+        with self._lock:
+            return all(
+                t in self._lists and now - self._lists[t]["updated_at"] <= max_age
+                for t in self.THREAT_TYPES
+            )
+
+    def start(self):
+        """Start refreshing the lists on a background daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def update_now(self):
+        """
+        Fetch list updates synchronously and persist them.
+        Raises requests.RequestException on network / API errors.
+        """
+        with self._lock:
+            states = {t: self._lists[t]["state"] for t in self._lists}
+
+        payload = {
+            "client": {
+                "clientId": "digital-literacy-assistant",
+                "clientVersion": "1.0.0"
+            },
+            "listUpdateRequests": [
+                {
+                    "threatType": threat_type,
+                    "platformType": self.PLATFORM_TYPE,
+                    "threatEntryType": self.THREAT_ENTRY_TYPE,
+                    "state": states.get(threat_type, ""),
+                    "constraints": {"supportedCompressions": ["RAW"]}
+                }
+                for threat_type in self.THREAT_TYPES
+            ]
+        }
+
+        response = self._http.post(
+            self.UPDATE_URL,
+            params={"key": self.api_key},
+            json=payload,
+            timeout=self.TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        with self._lock:
+            lists = dict(self._lists)
+
+        fetched_at = time.time()
+        for update in data.get("listUpdateResponses", []):
+            threat_type = update.get("threatType")
+            previous = lists.get(threat_type)
+            prefixes = self._apply_update(previous, update)
+            if prefixes is None:
+                # Checksum mismatch: start this list over next time
+                lists.pop(threat_type, None)
+            else:
+                lists[threat_type] = {
+                    "state": update.get("newClientState", ""),
+                    "prefixes": prefixes,
+                    "updated_at": fetched_at
+                }
+
+        wait = data.get("minimumWaitDuration")
+        if wait:
+            self._wait_seconds = max(self.UPDATE_INTERVAL_SECONDS, float(wait.rstrip("s")))
+
+        self._set_lists(lists)
+        self._save()
+
+    def might_be_unsafe(self, url: str) -> bool:
+        """
+        False means the URL is on none of the lists. True means it may be
+        and has to be confirmed with the Lookup API.
+        """
+        heads = self._heads
+        return any(
+            hashlib.sha256(expr.encode("utf-8")).digest()[:self.PREFIX_SIZE] in heads
+            for expr in url_expressions(url)
+        )
+
+    # ================= UPDATES =================
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.update_now()
+            except Exception as e:
+                print(f"Threat list update failed: {str(e)[:100]}")
+            self._stop.wait(self._wait_seconds)
+
+    @staticmethod
+    def _apply_update(previous: Optional[Dict], update: Dict) -> Optional[List[bytes]]:
+        """
+        Apply one listUpdateResponse to the current prefixes.
+        Returns the new sorted prefixes, or None if the checksum fails.
+        """
+        if update.get("responseType") == "FULL_UPDATE" or previous is None:
+            prefixes = []
+        else:
+            prefixes = list(previous["prefixes"])
+
+        # Removals are indices into the current sorted list
+        removed = set()
+        for removal in update.get("removals", []):
+            removed.update(removal.get("rawIndices", {}).get("indices", []))
+        if removed:
+            prefixes = [p for i, p in enumerate(prefixes) if i not in removed]
+
+        for addition in update.get("additions", []):
+            raw = addition.get("rawHashes", {})
+            size = raw.get("prefixSize", 4)
+            blob = base64.b64decode(raw.get("rawHashes", ""))
+            prefixes.extend(blob[i:i + size] for i in range(0, len(blob), size))
+
+        prefixes.sort()
+
+        expected = update.get("checksum", {}).get("sha256")
+        if expected:
+            actual = hashlib.sha256(b"".join(prefixes)).digest()
+            if actual != base64.b64decode(expected):
+                return None
+
+        return prefixes
+
+    def _set_lists(self, lists: Dict[str, Dict]):
+        heads = frozenset(
+            p[:self.PREFIX_SIZE] for entry in lists.values() for p in entry["prefixes"]
+        )
+        with self._lock:
+            self._lists = lists
+            self._heads = heads
+
+    # ================= PERSISTENCE =================
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(threat_lists)")]
+        if columns and "updated_at" not in columns:
+            # Older file without fetch times: drop it and download again
+            conn.execute("DROP TABLE threat_lists")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS threat_lists ("
+            "threat_type TEXT PRIMARY KEY, state TEXT, prefixes BLOB, updated_at REAL)"
+        )
+        return conn
+
+    def _load(self):
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT threat_type, state, prefixes, updated_at FROM threat_lists"
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return
+
+        self._set_lists({
+            threat_type: {"state": state, "prefixes": _unpack(blob), "updated_at": updated_at}
+            for threat_type, state, blob, updated_at in rows
+        })
+
+    def _save(self):
+        with self._lock:
+            lists = dict(self._lists)
+
+        try:
+            conn = self._connect()
+            try:
+                # Connection as context manager = one transaction
+                with conn:
+                    conn.execute("DELETE FROM threat_lists")
+                    conn.executemany(
+                        "INSERT INTO threat_lists VALUES (?, ?, ?, ?)",
+                        [
+                            (t, e["state"], _pack(e["prefixes"]), e["updated_at"])
+                            for t, e in lists.items()
+                        ]
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Could not persist threat lists: {e}")
+
+
+def _cache_dir() -> str:
+    """
+    Per-user cache directory for the app, readable only by its owner.
+    The shared temp dir would let other users plant a list file.
+    """
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "digital_literacy_assistant")
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    except OSError:
+        # sqlite errors are handled by _load/_save
+        pass
+    return path
+
+
+def _pack(prefixes: List[bytes]) -> bytes:
+    """Length-prefixed concatenation (prefixes may differ in size)."""
+    return b"".join(bytes([len(p)]) + p for p in prefixes)
+
+
+def _unpack(blob: bytes) -> List[bytes]:
+    prefixes = []
+    i = 0
+    while i < len(blob):
+        size = blob[i]
+        prefixes.append(blob[i + 1:i + 1 + size])
+        i += 1 + size
+    return prefixes
+
+
+# ================= URL CANONICALIZATION =================
+# Follows the Safe Browsing v4 canonicalization and suffix/prefix
+# expression rules closely enough for prefix matching.
+
+_IPV4_RE = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
+
+
+def _full_unescape(s: str) -> str:
+    previous = None
+    while s != previous:
+        previous = s
+        s = urllib.parse.unquote(s)
+    return s
+
+
+def _escape(s: str) -> str:
+    # Percent-escape ASCII <= 32, >= 127, "#" and "%"
+    return "".join(
+        c if 32 < ord(c) < 127 and c not in "#%" else
+        "".join(f"%{b:02X}" for b in c.encode("utf-8"))
+        for c in s
+    )
+
+
+def canonicalize(url: str) -> str:
+    """
+    Safe Browsing canonical form: host and path fully unescaped, lowercase
+    host without extra dots, resolved path, no fragment, then re-escaped.
+    """
+    url = re.sub(r'[\t\r\n]', '', url.strip())
+    url = url.split('#', 1)[0]
+    if '://' not in url:
+        url = 'http://' + url
+
+    parts = urllib.parse.urlsplit(url)
+    host = _full_unescape(parts.hostname or "").strip('.').lower()
+    host = re.sub(r'\.{2,}', '.', host)
+
+    path = _full_unescape(parts.path) or "/"
+    trailing = path.endswith('/')
+    path = posixpath.normpath(path)
+    path = re.sub(r'/{2,}', '/', path)
+    if path == '.':
+        path = '/'
+    if trailing and not path.endswith('/'):
+        path += '/'
+
+    canonical = f"{parts.scheme.lower()}://{_escape(host)}{_escape(path)}"
+    if '?' in url:
+        canonical += '?' + parts.query
+    return canonical
+
+
+def url_expressions(url: str) -> List[str]:
+    """
+    host/path combinations to hash for a URL: up to 5 host suffixes
+    times up to 6 path prefixes.
+    """
+    canonical = canonicalize(url)
+    rest = canonical.split('://', 1)[1]
+    host, _, path_query = rest.partition('/')
+    path_query = '/' + path_query
+
+    hosts = [host]
+    if not _IPV4_RE.match(host):
+        labels = host.split('.')
+        # Last 5 components, removing one at a time, but never the TLD alone
+        start = max(1, len(labels) - 5)
+        hosts += ['.'.join(labels[i:]) for i in range(start, len(labels) - 1)]
+
+    path, _, query = path_query.partition('?')
+    paths = [path_query]
+    if query:
+        paths.append(path)
+    # "/" plus up to 3 leading directories
+    prefix = '/'
+    paths.append(prefix)
+    for segment in path.split('/')[1:-1][:3]:
+        prefix += segment + '/'
+        paths.append(prefix)
+
+    return list(dict.fromkeys(h + p for h in hosts for p in paths))
@@ -1,8 +1,305 @@
+import asyncio
+import posixpath
 import re
 import urllib.parse
-from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
+import ahocorasick
+from rapidfuzz import process
+from rapidfuzz.distance import DamerauLevenshtein
 import tldextract
+from tldextract import ExtractResult
 import socket
+import threading
+from cachetools import LRUCache, TTLCache
+
+# google-re2 gives linear-time (non-backtracking) matching when installed.
+# The stdlib fallback matches the same strings (see _SPACES) but can go
+# quadratic on long runs of label characters such as "-----...".
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = None
+
+
+def _compile(pattern: str):
+    """
+    Compile with re2 when it's installed and accepts the pattern,
+    otherwise with the stdlib engine.
+    """
+    if _re_engine is not None:
+        try:
+            return _re_engine.compile(pattern)
+        except _re_engine.error:
+            pass
+    return re.compile(pattern)
+
+# Non-ASCII letters allowed in host labels: Greek and Cyrillic, so homoglyph
+# domains are extracted whole. The final label of a bare domain must still be
+# ASCII (or punycode), otherwise "word.word" in other scripts reads as a URL.
+_HOST_LETTERS = '\u0370-\u03ff\u0400-\u04ff'
+
+# Every character stdlib's \s matches. re2's \s is ASCII-only (and lacks \v),
+# so the rest are listed explicitly to make both engines stop at them.
+_SPACES = '\\s\x0b\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+
+# URL regex pattern: full http(s) URLs, or bare domains (www.x.com, x.com/path).
+# One alternation so the text is scanned once; the named group says which matched.
+_URL_RE = _compile(
+    r'(?P<full>http[s]?://(?:[a-zA-Z' + _HOST_LETTERS + r']|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+)'
+    r'|(?P<bare>(?:[a-zA-Z0-9' + _HOST_LETTERS + r'-]+\.)+(?:xn--[a-zA-Z0-9-]+|[a-zA-Z]{2,})(?:/[^' + _SPACES + r']*)?)'
+)
+
+# Sentence punctuation that often sticks to the end of a URL
+_TRAILING_PUNCTUATION = '.,);]'
+
+# One extractor for every call. With no suffix_list_urls it reads the public
+# suffix list snapshot bundled with tldextract on first use and never goes to
+# the network. _EXTRACT.update(fetch_now=True) is the explicit refresh hook:
+# it reloads the list (pass suffix_list_urls above to fetch a newer one).
+# No disk cache: the snapshot needs none, and a shared cache directory
+# would let another user plant a suffix list.
+_EXTRACT = tldextract.TLDExtract(
+    suffix_list_urls=(),
+    fallback_to_snapshot=True,
+    cache_dir=None
+)
+
+# URL canonicalization (URLAnalyzer.canonicalize)
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_SLASHES_RE = re.compile(r'/{2,}')
+_ESCAPE_RE = re.compile(r'%([0-9A-Fa-f]{2})')
+_UNRESERVED = frozenset(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~'
+)
+
+
+def _normalize_escapes(s: str) -> str:
+    """Decode escaped unreserved characters, uppercase the other escapes."""
+    def fix(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else '%' + match.group(1).upper()
+    return _ESCAPE_RE.sub(fix, s)
+
+
+def _canonical_from_parts(parts: urllib.parse.SplitResult) -> str:
+    """Body of URLAnalyzer.canonicalize. Raises ValueError on a bad port."""
+    port = parts.port
+    scheme = parts.scheme.lower()
+    
+    # hostname is already lowercase, without brackets or userinfo
+    host = (parts.hostname or "").rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"
+    if port is not None and _DEFAULT_PORTS.get(scheme) != port:
+        host = f"{host}:{port}"
+    # Userinfo stays: "@" in a URL is itself a phishing signal
+    userinfo, at, _ = parts.netloc.rpartition('@')
+    netloc = userinfo + at + host
+    
+    path = _normalize_escapes(parts.path)
+    if path:
+        norm = posixpath.normpath(_SLASHES_RE.sub('/', path))
+        # normpath drops the trailing slash, but /dir/ and /dir are
+        # different URLs (and different Safe Browsing expressions)
+        if path.endswith('/') and not norm.endswith('/'):
+            norm += '/'
+        path = '' if norm == '/' else norm
+    
+    return urllib.parse.urlunsplit(
+        (scheme, netloc, path, _normalize_escapes(parts.query), "")
+    )
+
+
+# Raw IPv4 address used as the host
+_IP_RE = _compile(r'\d+\.\d+\.\d+\.\d+')
+
+# Cyrillic / Greek letters that look like Latin ones (homoglyphs).
+# str.translate does the whole lookup in one C-level pass.
+_CONFUSABLES = str.maketrans({
+    # Cyrillic lowercase
+    'а': 'a', 'в': 'b', 'е': 'e', 'к': 'k', 'м': 'm', 'н': 'h',
+    'о': 'o', 'р': 'p', 'с': 'c', 'т': 't', 'у': 'y', 'х': 'x',
+    'ѕ': 's', 'і': 'i', 'ј': 'j', 'ԁ': 'd', 'ԛ': 'q', 'ԝ': 'w',
+    'һ': 'h', 'ӏ': 'l',
+    # Cyrillic uppercase
+    'А': 'A', 'В': 'B', 'Е': 'E', 'К': 'K', 'М': 'M', 'Н': 'H',
+    'О': 'O', 'Р': 'P', 'С': 'C', 'Т': 'T', 'Х': 'X', 'Ѕ': 'S',
+    'І': 'I', 'Ј': 'J',
+    # Greek
+    'α': 'a', 'ο': 'o', 'ρ': 'p', 'ν': 'v', 'τ': 't', 'υ': 'u',
+    'ι': 'i', 'κ': 'k', 'χ': 'x',
+    'Α': 'A', 'Β': 'B', 'Ε': 'E', 'Ζ': 'Z', 'Η': 'H', 'Ι': 'I',
+    'Κ': 'K', 'Μ': 'M', 'Ν': 'N', 'Ο': 'O', 'Ρ': 'P', 'Τ': 'T',
+    'Υ': 'Y', 'Χ': 'X',
+})
+
+
+class RedFlag(IntEnum):
+    """
+    Red flags raised by URLAnalyzer.analyze_url, numbered in check order.
+    """
+    IP_ADDRESS = 1
+    LONG_URL = 2
+    SUSPICIOUS_TLD = 3
+    AT_SYMBOL = 4
+    MANY_SUBDOMAINS = 5
+    NO_HTTPS = 6
+    PHISHING_KEYWORDS = 7
+    TYPOSQUATTING = 8
+    MANY_HYPHENS = 9
+    HOMOGLYPHS = 10
+    KNOWN_LEGITIMATE = 11
+    MALFORMED = 12
+
+
+# flag -> (title, severity, explanation); {fields} are filled by to_dict()
+_RED_FLAG_TEXT = {
+    RedFlag.IP_ADDRESS: (
+        "IP Address Used", "high",
+        "Legitimate sites use domain names, not raw IP addresses"
+    ),
+    RedFlag.LONG_URL: (
+        "Unusually Long URL", "medium",
+        "URL is {url_length} characters long. Phishing URLs are often excessively long."
+    ),
+    RedFlag.SUSPICIOUS_TLD: (
+        "Suspicious Domain Extension (.{suffix})", "medium",
+        ".{suffix} domains are commonly used in phishing attacks"
+    ),
+    RedFlag.AT_SYMBOL: (
+        "@ Symbol in URL", "high",
+        "The @ symbol can hide the real destination domain"
+    ),
+    RedFlag.MANY_SUBDOMAINS: (
+        "Too Many Subdomains", "medium",
+        "Multiple subdomains ({subdomain}) can indicate domain spoofing"
+    ),
+    RedFlag.NO_HTTPS: (
+        "No HTTPS Encryption", "low",
+        "URL doesn't use secure HTTPS protocol"
+    ),
+    RedFlag.PHISHING_KEYWORDS: (
+        "Suspicious Keywords in Domain", "medium",
+        "Domain contains phishing keywords: {keywords}"
+    ),
+    RedFlag.TYPOSQUATTING: (
+        "Possible Typosquatting", "high",
+        "Domain '{name}' looks similar to '{lookalike}' - possible impersonation"
+    ),
+    RedFlag.MANY_HYPHENS: (
+        "Many Hyphens in Domain", "low",
+        "Excessive hyphens can indicate a fake domain"
+    ),
+    RedFlag.HOMOGLYPHS: (
+        "Lookalike Unicode Characters", "high",
+        "Domain uses non-Latin letters that look like normal ones (reads as '{reads_as}')"
+    ),
+    RedFlag.KNOWN_LEGITIMATE: (
+        "Known Legitimate Domain", "low",
+        "{domain} is a recognized legitimate domain"
+    ),
+    RedFlag.MALFORMED: (
+        "Malformed URL", "medium",
+        "URL structure appears invalid or malformed"
+    ),
+}
+
+
+class UrlContext(NamedTuple):
+    """
+    A URL parsed once and shared by every stage of one analysis:
+    structure checks, DNS lookups and Safe Browsing.
+    parsed and extracted are None if the URL couldn't be parsed.
+    """
+    url: str
+    parsed: Optional[urllib.parse.SplitResult]
+    extracted: Optional[ExtractResult]
+    canonical: str
+
+
+def _hostname(context: UrlContext) -> str:
+    """
+    Host to resolve: no userinfo, port or IPv6 brackets.
+    Empty if the URL couldn't be parsed.
+    """
+    if context.parsed is None:
+        return ""
+    return context.parsed.hostname or ""
+
+
+@dataclass(frozen=True, slots=True)
+class UrlAnalysisResult:
+    """
+    Result of URLAnalyzer.analyze_url. Immutable, so cached results can be
+    shared; to_dict() gives the analyze_url_structure format.
+    """
+    url: str
+    domain: str = ""
+    subdomain: str = ""
+    scheme: str = ""
+    risk_score: int = 0
+    flags: Tuple[RedFlag, ...] = ()
+    # Only set when the matching flag is raised
+    keywords: str = ""
+    lookalike: str = ""
+    reads_as: str = ""
+    error: Optional[str] = None
+    
+    @property
+    def is_safe(self) -> bool:
+        return self.risk_score < 40
+    
+    @property
+    def flags_mask(self) -> int:
+        """Flags as a bitmask: bit n is set for RedFlag value n."""
+        mask = 0
+        for flag in self.flags:
+            mask |= 1 << flag
+        return mask
+    
+    def to_dict(self) -> Dict:
+        fields = {
+            "url_length": len(self.url),
+            "domain": self.domain,
+            "name": self.domain.split('.', 1)[0],
+            "suffix": self.domain.split('.', 1)[-1],
+            "subdomain": self.subdomain,
+            "keywords": self.keywords,
+            "lookalike": self.lookalike,
+            "reads_as": self.reads_as
+        }
+        red_flags = []
+        for flag in self.flags:
+            title, severity, explanation = _RED_FLAG_TEXT[flag]
+            red_flags.append({
+                "flag": title.format(**fields),
+                "severity": severity,
+                "explanation": explanation.format(**fields)
+            })
+        
+        if self.error is not None:
+            return {
+                "url": self.url,
+                "error": self.error,
+                "risk_score": self.risk_score,
+                "red_flags": red_flags,
+                "is_safe": self.is_safe
+            }
+        
+        return {
+            "url": self.url,
+            "domain": self.domain,
+            "subdomain": self.subdomain,
+            "scheme": self.scheme,
+            "risk_score": self.risk_score,
+            "red_flags": red_flags,
+            "is_safe": self.is_safe
+        }
+
 
 class URLAnalyzer:
     """
@@ -17,205 +314,265 @@ class URLAnalyzer:
         'ebay', 'apple', 'microsoft', 'netflix', 'suspended', 'unusual'
     ]
     
-    # Suspicious TLDs
-    SUSPICIOUS_TLDS = [
+    # Suspicious TLDs (set: only used for membership tests)
+    SUSPICIOUS_TLDS = frozenset({
         '.tk', '.ml', '.ga', '.cf', '.gq', '.xyz', '.top', '.work',
         '.click', '.link', '.download', '.loan', '.win', '.bid'
-    ]
+    })
     
-    # Legitimate domains (whitelist)
+    # Legitimate domains (whitelist), in typosquatting check order
     LEGITIMATE_DOMAINS = [
         'google.com', 'facebook.com', 'amazon.com', 'apple.com',
         'microsoft.com', 'netflix.com', 'paypal.com', 'twitter.com',
         'instagram.com', 'linkedin.com', 'youtube.com', 'github.com'
     ]
     
+    # Per-domain limit for batch_analyze_urls_async
+    DNS_TIMEOUT_SECONDS = 2.0
+    
+    @staticmethod
+    def canonicalize(url: str) -> str:
+        """
+        Canonical form of a URL, so spellings of the same address compare
+        equal: lowercase scheme and host, default port, fragment and
+        duplicate slashes dropped, "."/".." and trailing "/" resolved,
+        percent-escapes normalized. The host is kept in Unicode so the
+        homoglyph check still sees it. Unparseable URLs come back as-is.
+        """
+        try:
+            return _canonical_from_parts(urllib.parse.urlsplit(url.strip()))
+        except ValueError:
+            return url
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def build_context(url: str) -> "UrlContext":
+        """
+        Parse a URL once for every stage that needs it. Contexts are
+        cached and never modified, so each URL is only parsed once.
+        """
+        try:
+            parsed = urllib.parse.urlsplit(url)
+            extracted = _EXTRACT(url)
+        except Exception:
+            # analyze_context reports these as malformed
+            return UrlContext(url, None, None, url)
+        
+        try:
+            if url == url.strip():
+                canonical = _canonical_from_parts(parsed)
+            else:
+                canonical = URLAnalyzer.canonicalize(url)
+        except ValueError:
+            canonical = url
+        return UrlContext(url, parsed, extracted, canonical)
+    
+    @staticmethod
+    def build_contexts(urls: List[Union[str, "UrlContext"]]) -> List["UrlContext"]:
+        """
+        One context per distinct canonical URL, in first-seen order.
+        Accepts URLs or contexts that were already built.
+        """
+        contexts = {}
+        for url in urls:
+            context = url if isinstance(url, UrlContext) else URLAnalyzer.build_context(url)
+            contexts.setdefault(context.canonical, context)
+        return list(contexts.values())
+    
+    @staticmethod
+    def is_legitimate_domain(url: Union[str, "UrlContext"]) -> bool:
+        """
+        True if the URL's registered domain is in LEGITIMATE_DOMAINS.
+        """
+        context = url if isinstance(url, UrlContext) else URLAnalyzer.build_context(url)
+        extracted = context.extracted
+        if extracted is None:
+            return False
+        return f"{extracted.domain}.{extracted.suffix}".lower() in _LEGITIMATE_SET
+    
     @staticmethod
     def extract_urls(text: str) -> List[str]:
         """
         Extract all URLs from text.
         Returns list of URLs found.
         """
-        # URL regex pattern
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        
-        # Also match URLs without http/https
-        simple_url_pattern = r'(?:www\.|[a-zA-Z0-9-]+\.)[a-zA-Z]{2,}(?:/[^\s]*)?'
-        
-        urls = re.findall(url_pattern, text)
-        simple_urls = re.findall(simple_url_pattern, text)
-        
-        # Add http:// to simple URLs
-        for url in simple_urls:
-            if not url.startswith(('http://', 'https://')):
-                urls.append('http://' + url)
-            else:
-                urls.append(url)
+        urls = {}
+        for match in _URL_RE.finditer(text):
+            url = match.group('full') or 'http://' + match.group('bare')
+            url = URLAnalyzer.canonicalize(url.rstrip(_TRAILING_PUNCTUATION))
+            # dict keeps first-seen order while removing duplicates
+            urls[url] = None
         
-        return list(set(urls))  # Remove duplicates
+        return list(urls)
     
     @staticmethod
-    def analyze_url_structure(url: str) -> Dict:
+    def analyze_url_structure(url: Union[str, "UrlContext"]) -> Dict:
         """
         Analyze URL structure for suspicious patterns.
+        Takes a URL or a context from build_context(s).
         Returns dict with risk score and red flags.
         """
+        if isinstance(url, UrlContext):
+            return URLAnalyzer.analyze_context(url).to_dict()
+        return URLAnalyzer.analyze_url(url).to_dict()
+    
+    @staticmethod
+    def analyze_url(url: str) -> "UrlAnalysisResult":
+        """
+        Compact form of analyze_url_structure: flags are RedFlag values
+        and their text is only built by to_dict().
+        """
+        return URLAnalyzer.analyze_context(URLAnalyzer.build_context(url))
+    
+    @staticmethod
+    def analyze_context(context: "UrlContext") -> "UrlAnalysisResult":
+        """
+        analyze_url for an already parsed URL. Results are cached per URL.
+        """
+        with _ANALYSIS_CACHE_LOCK:
+            result = _ANALYSIS_CACHE.get(context.url)
+        if result is None:
+            result = URLAnalyzer._analyze(context)
+            with _ANALYSIS_CACHE_LOCK:
+                _ANALYSIS_CACHE[context.url] = result
+        return result
+    
+    @staticmethod
+    def _analyze(context: "UrlContext") -> "UrlAnalysisResult":
+        """
+        Body of analyze_context.
+        """
+        url = context.url
         risk_score = 0
-        red_flags = []
+        flags = []
         
         try:
-            parsed = urllib.parse.urlparse(url)
-            extracted = tldextract.extract(url)
+            parsed = context.parsed
+            extracted = context.extracted
+            if parsed is None:
+                # Parsing failed when the context was built; parse again
+                # to raise the same error inside this try
+                parsed = urllib.parse.urlsplit(url)
+                extracted = _EXTRACT(url)
             
             domain = extracted.domain
             suffix = extracted.suffix
             subdomain = extracted.subdomain
             full_domain = f"{domain}.{suffix}"
             
+            result = {
+                "url": url,
+                "domain": full_domain,
+                "subdomain": subdomain,
+                "scheme": parsed.scheme
+            }
+            
+            # Whitelisted domains skip the heuristics below entirely
+            if full_domain.lower() in _LEGITIMATE_SET:
+                return UrlAnalysisResult(**result, flags=(RedFlag.KNOWN_LEGITIMATE,))
+            
             # 1. Check for IP address instead of domain
-            if re.match(r'\d+\.\d+\.\d+\.\d+', parsed.netloc):
+            if _IP_RE.match(parsed.netloc):
                 risk_score += 30
-                red_flags.append({
-                    "flag": "IP Address Used",
-                    "severity": "high",
-                    "explanation": "Legitimate sites use domain names, not raw IP addresses"
-                })
+                flags.append(RedFlag.IP_ADDRESS)
             
             # 2. Check URL length (phishing URLs are often very long)
             if len(url) > 75:
                 risk_score += 15
-                red_flags.append({
-                    "flag": "Unusually Long URL",
-                    "severity": "medium",
-                    "explanation": f"URL is {len(url)} characters long. Phishing URLs are often excessively long."
-                })
+                flags.append(RedFlag.LONG_URL)
             
             # 3. Check for suspicious TLD
-            if f".{suffix}" in URLAnalyzer.SUSPICIOUS_TLDS:
+            if suffix in _SUSPICIOUS_SUFFIXES:
                 risk_score += 20
-                red_flags.append({
-                    "flag": f"Suspicious Domain Extension (.{suffix})",
-                    "severity": "medium",
-                    "explanation": f".{suffix} domains are commonly used in phishing attacks"
-                })
+                flags.append(RedFlag.SUSPICIOUS_TLD)
             
             # 4. Check for @ symbol (hides real domain)
             if '@' in url:
                 risk_score += 35
-                red_flags.append({
-                    "flag": "@ Symbol in URL",
-                    "severity": "high",
-                    "explanation": "The @ symbol can hide the real destination domain"
-                })
+                flags.append(RedFlag.AT_SYMBOL)
             
             # 5. Check for excessive subdomains
             if subdomain and subdomain.count('.') > 2:
                 risk_score += 20
-                red_flags.append({
-                    "flag": "Too Many Subdomains",
-                    "severity": "medium",
-                    "explanation": f"Multiple subdomains ({subdomain}) can indicate domain spoofing"
-                })
+                flags.append(RedFlag.MANY_SUBDOMAINS)
             
             # 6. Check for HTTPS
             if parsed.scheme != 'https':
                 risk_score += 10
-                red_flags.append({
-                    "flag": "No HTTPS Encryption",
-                    "severity": "low",
-                    "explanation": "URL doesn't use secure HTTPS protocol"
-                })
+                flags.append(RedFlag.NO_HTTPS)
             
             # 7. Check for phishing keywords in domain
+            # One Aho-Corasick pass finds both phishing keywords and
+            # legitimate brand names contained in the domain
             domain_lower = full_domain.lower()
-            found_keywords = [kw for kw in URLAnalyzer.PHISHING_KEYWORDS if kw in domain_lower]
+            name_lower = domain.lower()
+            keyword_hits = set()
+            brand_hits = set()
+            for end, (word, is_keyword, is_brand) in _DOMAIN_AUTOMATON.iter(domain_lower):
+                if is_keyword:
+                    keyword_hits.add(word)
+                # Brand names only count inside the name part, not the suffix
+                if is_brand and end < len(name_lower):
+                    brand_hits.add(word)
+            found_keywords = [kw for kw in URLAnalyzer.PHISHING_KEYWORDS if kw in keyword_hits]
             if found_keywords:
                 risk_score += 15
-                red_flags.append({
-                    "flag": "Suspicious Keywords in Domain",
-                    "severity": "medium",
-                    "explanation": f"Domain contains phishing keywords: {', '.join(found_keywords)}"
-                })
+                flags.append(RedFlag.PHISHING_KEYWORDS)
+                result["keywords"] = ', '.join(found_keywords)
             
             # 8. Check for typosquatting (misspelled legitimate domains)
-            for legit_domain in URLAnalyzer.LEGITIMATE_DOMAINS:
-                legit_name = legit_domain.split('.')[0]
-                if URLAnalyzer._is_similar(domain.lower(), legit_name.lower()) and domain.lower() != legit_name.lower():
-                    risk_score += 40
-                    red_flags.append({
-                        "flag": f"Possible Typosquatting",
-                        "severity": "high",
-                        "explanation": f"Domain '{domain}' looks similar to '{legit_name}' - possible impersonation"
-                    })
-                    break
+            # A brand inside the domain counts first, then the closest brand
+            # by Damerau-Levenshtein similarity
+            lookalike = next(
+                (n for n in _LEGITIMATE_NAMES if n in brand_hits and n != name_lower),
+                None
+            )
+            if lookalike is None:
+                candidates = _LEGITIMATE_NAMES
+                if name_lower in _LEGITIMATE_NAME_SET:
+                    candidates = [n for n in candidates if n != name_lower]
+                best = process.extractOne(
+                    name_lower,
+                    candidates,
+                    scorer=DamerauLevenshtein.normalized_similarity,
+                    score_cutoff=_SIMILARITY_THRESHOLD
+                )
+                if best is not None:
+                    lookalike = best[0]
+            
+            if lookalike is not None:
+                risk_score += 40
+                flags.append(RedFlag.TYPOSQUATTING)
+                result["lookalike"] = lookalike
             
             # 9. Check for excessive hyphens or numbers
             if domain.count('-') > 2:
                 risk_score += 10
-                red_flags.append({
-                    "flag": "Many Hyphens in Domain",
-                    "severity": "low",
-                    "explanation": "Excessive hyphens can indicate a fake domain"
-                })
+                flags.append(RedFlag.MANY_HYPHENS)
             
-            # 10. Check if domain is in whitelist
-            if full_domain.lower() in URLAnalyzer.LEGITIMATE_DOMAINS:
-                risk_score = max(0, risk_score - 30)
-                red_flags.append({
-                    "flag": "Known Legitimate Domain",
-                    "severity": "low",
-                    "explanation": f"{full_domain} is a recognized legitimate domain"
-                })
+            # 10. Check for lookalike Unicode characters (homoglyphs)
+            host = parsed.hostname
+            if host is None:
+                # Scheme-less input ("amazon-primе.com/renew") parses as a path
+                host = urllib.parse.urlsplit('http://' + url).hostname or ''
+            reads_as = host.translate(_CONFUSABLES)
+            if reads_as != host:
+                risk_score += 40
+                flags.append(RedFlag.HOMOGLYPHS)
+                result["reads_as"] = reads_as
             
             # Cap risk score at 100
             risk_score = min(100, risk_score)
             
-            return {
-                "url": url,
-                "domain": full_domain,
-                "subdomain": subdomain,
-                "scheme": parsed.scheme,
-                "risk_score": risk_score,
-                "red_flags": red_flags,
-                "is_safe": risk_score < 40
-            }
+            return UrlAnalysisResult(**result, risk_score=risk_score, flags=tuple(flags))
             
         except Exception as e:
-            return {
-                "url": url,
-                "error": f"Failed to parse URL: {str(e)}",
-                "risk_score": 50,
-                "red_flags": [{
-                    "flag": "Malformed URL",
-                    "severity": "medium",
-                    "explanation": "URL structure appears invalid or malformed"
-                }],
-                "is_safe": False
-            }
-    
-    @staticmethod
-    def _is_similar(str1: str, str2: str, threshold: float = 0.7) -> bool:
-        """
-        Check if two strings are similar (for typosquatting detection).
-        Uses simple character-based similarity.
-        """
-        if str1 == str2:
-            return False
-        
-        # Check if one contains the other
-        if str1 in str2 or str2 in str1:
-            return True
-        
-        # Check Levenshtein-like similarity
-        max_len = max(len(str1), len(str2))
-        if max_len == 0:
-            return False
-        
-        differences = sum(c1 != c2 for c1, c2 in zip(str1, str2))
-        differences += abs(len(str1) - len(str2))
-        
-        similarity = 1 - (differences / max_len)
-        return similarity >= threshold
+            return UrlAnalysisResult(
+                url=url,
+                risk_score=50,
+                flags=(RedFlag.MALFORMED,),
+                error=f"Failed to parse URL: {str(e)}"
+            )
     
     @staticmethod
     def get_url_info(url: str) -> Dict:
@@ -223,19 +580,13 @@ class URLAnalyzer:
         Get additional information about URL (DNS, port scan, etc.)
         """
         try:
-            parsed = urllib.parse.urlparse(url)
-            domain = parsed.netloc.split(':')[0]
+            domain = urllib.parse.urlsplit(url).hostname or ""
             
             # Try to resolve domain
-            try:
-                ip_address = socket.gethostbyname(domain)
-                dns_resolved = True
-            except socket.gaierror:
-                ip_address = None
-                dns_resolved = False
+            ip_address = _resolve(domain)
             
             return {
-                "dns_resolved": dns_resolved,
+                "dns_resolved": ip_address is not None,
                 "ip_address": ip_address,
                 "domain": domain
             }
@@ -246,13 +597,123 @@ class URLAnalyzer:
             }
     
     @staticmethod
-    def batch_analyze_urls(urls: List[str]) -> List[Dict]:
+    def batch_analyze_urls(urls: List[Union[str, "UrlContext"]]) -> List[Dict]:
         """
-        Analyze multiple URLs at once.
+        Analyze multiple URLs (or contexts) at once.
         Returns list of analysis results.
         """
         results = []
         for url in urls:
             analysis = URLAnalyzer.analyze_url_structure(url)
             results.append(analysis)
-        return results
\ No newline at end of file
+        return results
+    
+    @staticmethod
+    async def batch_analyze_urls_async(urls: List[Union[str, "UrlContext"]]) -> List[Dict]:
+        """
+        Analyze multiple URLs and resolve their domains concurrently.
+        Same results as batch_analyze_urls, each with a "url_info" entry
+        shaped like get_url_info. Every distinct domain is resolved once,
+        and a lookup slower than DNS_TIMEOUT_SECONDS counts as unresolved.
+        """
+        results = URLAnalyzer.batch_analyze_urls(urls)
+        
+        domains = [
+            _hostname(url if isinstance(url, UrlContext) else URLAnalyzer.build_context(url))
+            for url in urls
+        ]
+        unique_domains = list(dict.fromkeys(domains))
+        
+        loop = asyncio.get_running_loop()
+        lookups = await asyncio.gather(*[
+            asyncio.wait_for(
+                loop.run_in_executor(_DNS_POOL, _resolve, domain),
+                timeout=URLAnalyzer.DNS_TIMEOUT_SECONDS
+            )
+            for domain in unique_domains
+        ], return_exceptions=True)
+        
+        url_info = {}
+        for domain, lookup in zip(unique_domains, lookups):
+            if isinstance(lookup, asyncio.TimeoutError):
+                url_info[domain] = {"dns_resolved": False, "ip_address": None, "domain": domain}
+            elif isinstance(lookup, Exception):
+                url_info[domain] = {"dns_resolved": False, "error": str(lookup)}
+            else:
+                url_info[domain] = {"dns_resolved": lookup is not None, "ip_address": lookup, "domain": domain}
+        
+        for result, domain in zip(results, domains):
+            result["url_info"] = dict(url_info[domain])
+        return results
+
+
+# Structure analysis results by URL (analyze_context)
+_ANALYSIS_CACHE = LRUCache(maxsize=4096)
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+
+# Shared by batch_analyze_urls_async; threads are started on first use.
+# A timed-out lookup keeps its thread until the resolver gives up.
+_DNS_POOL = ThreadPoolExecutor(max_workers=20, thread_name_prefix="dns")
+
+# Recent DNS answers. Failures expire sooner so a domain that comes up
+# isn't reported unresolvable for long, but a dead domain repeated across
+# many messages only waits for the resolver once.
+_DNS_POSITIVE = TTLCache(maxsize=4096, ttl=300)
+_DNS_NEGATIVE = TTLCache(maxsize=4096, ttl=30)
+_DNS_CACHE_LOCK = threading.Lock()
+
+
+def _resolve(domain: str):
+    """
+    gethostbyname through the DNS caches.
+    Returns the IP address, or None if the domain doesn't resolve.
+    """
+    if not domain:
+        # gethostbyname("") would return 0.0.0.0
+        return None
+    
+    with _DNS_CACHE_LOCK:
+        if domain in _DNS_POSITIVE:
+            return _DNS_POSITIVE[domain]
+        if domain in _DNS_NEGATIVE:
+            return None
+    
+    try:
+        ip_address = socket.gethostbyname(domain)
+    except socket.gaierror:
+        ip_address = None
+    
+    with _DNS_CACHE_LOCK:
+        if ip_address is None:
+            _DNS_NEGATIVE[domain] = True
+        else:
+            _DNS_POSITIVE[domain] = ip_address
+    return ip_address
+
+
+# Lookup tables derived from the class lists, built once at import
+_LEGITIMATE_SET = frozenset(d.lower() for d in URLAnalyzer.LEGITIMATE_DOMAINS)
+_LEGITIMATE_NAMES = tuple(d.split('.')[0].lower() for d in URLAnalyzer.LEGITIMATE_DOMAINS)
+_LEGITIMATE_NAME_SET = frozenset(_LEGITIMATE_NAMES)
+# SUSPICIOUS_TLDS without the leading dot, to match tldextract's suffix as-is
+_SUSPICIOUS_SUFFIXES = frozenset(t.lstrip('.') for t in URLAnalyzer.SUSPICIOUS_TLDS)
+
+_SIMILARITY_THRESHOLD = 0.7
+
+
+def _build_domain_automaton() -> ahocorasick.Automaton:
+    """
+    Automaton over phishing keywords and legitimate brand names.
+    Each word maps to (word, is_keyword, is_brand).
+    """
+    keywords = set(URLAnalyzer.PHISHING_KEYWORDS)
+    brands = set(_LEGITIMATE_NAMES)
+    automaton = ahocorasick.Automaton()
+    for word in keywords | brands:
+        automaton.add_word(word, (word, word in keywords, word in brands))
+    automaton.make_automaton()
+    return automaton
+
+
+_DOMAIN_AUTOMATON = _build_domain_automaton()
+